@@ -1,20 +1,24 @@
 import os
+import stat
+import string
 import sys
 import random
 import re
+import time
 from pathlib import Path
 import traceback
+from os import fspath
 
-from PySide6.QtCore import Qt, QThread, Signal, QUrl, QTimer
-from PySide6.QtGui import QIcon
+from PySide6.QtCore import Qt, QThread, Signal, QUrl, QTimer, QObject, QRunnable, QThreadPool, QLocale
+from PySide6.QtGui import QIcon, QDoubleValidator
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFileDialog, QListWidget, QListWidgetItem, QPlainTextEdit, QProgressBar,
     QGroupBox, QLineEdit, QFormLayout, QMessageBox, QComboBox, QSpinBox, QCheckBox, QSlider,
-    QTabWidget, QToolButton, QAbstractItemView
+    QTabWidget, QToolButton, QAbstractItemView, QListView
 )
 from PySide6.QtGui import QDesktopServices
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput, QMediaDevices
 
 # Try to load QDarkStyle if available
 _HAS_QDARK = False
@@ -24,23 +28,46 @@ try:
 except Exception:
     _HAS_QDARK = False
 
-# Import processing engine
-try:
-    from engine import apply_envelopes
-except Exception:
-    def apply_envelopes(dest_path, mold_paths, out_path, cfg, progress_cb, log_cb):
-        log_cb("[WARN] engine.apply_envelopes no encontrado, se copia el destino como salida dummy.")
-        import shutil, time
-        total = max(1, len(mold_paths))
-        for i, p in enumerate(mold_paths, start=1):
-            time.sleep(0.1)
-            progress_cb(int(i * 80 / total))
-            log_cb(f"Molde dummy: {Path(p).name}")
-        shutil.copy2(dest_path, out_path)
-        progress_cb(100)
-        log_cb(f"Listo. (Salida: {out_path})")
-
-AUDIO_EXTS = {'.wav', '.mp3', '.flac', '.ogg', '.m4a', '.aiff', '.aif'}
+def _fast_copy(src, dst):
+    """Copia src→dst con os.sendfile (zero-copy en Linux) y fallback por bloques."""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        if hasattr(os, 'sendfile'):
+            try:
+                src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+                offset = 0
+                while True:
+                    sent = os.sendfile(dst_fd, src_fd, offset, 1 << 20)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError:
+                # sendfile pudo fallar a mitad de copia: rebobinar y truncar
+                # el destino antes del fallback para no duplicar lo ya escrito
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+                import shutil
+                shutil.copyfileobj(fsrc, fdst, length=4 * 1024 * 1024)
+        else:
+            import shutil
+            shutil.copyfileobj(fsrc, fdst, length=4 * 1024 * 1024)
+    st = os.stat(src)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+# El engine (numpy/scipy/librosa) se importa recién en Worker.run para no
+# retrasar el primer pintado de la ventana; ver también _EngineWarmup.
+def _dummy_apply_envelopes(dest_path, mold_paths, out_path, cfg, progress_cb, log_cb):
+    log_cb("[WARN] engine.apply_envelopes no encontrado, se copia el destino como salida dummy.")
+    total = max(1, len(mold_paths))
+    for i, p in enumerate(mold_paths, start=1):
+        time.sleep(0.1)
+        progress_cb(int(i * 80 / total))
+        log_cb(f"Molde dummy: {Path(p).name}")
+    _fast_copy(dest_path, out_path)
+    progress_cb(100)
+    log_cb(f"Listo. (Salida: {out_path})")
+
+AUDIO_EXTS = frozenset({'.wav', '.mp3', '.flac', '.ogg', '.m4a', '.aiff', '.aif'})
 GENRES = [
     "pop", "rock", "r&b", "house", "trap", "reggaeton",
     "afrobeat", "brasil funk", "funk", "soul", "jazz",
@@ -53,72 +80,146 @@ def _base_dir_for_data() -> Path:
     else:
         return Path(__file__).parent
 
+# Resueltas una sola vez: ni el directorio base ni "genres" cambian en ejecución
+_BASE_DIR = _base_dir_for_data()
+_GENRES_BASE = _BASE_DIR / "genres"
+
 def app_genres_dir() -> Path:
-    return _base_dir_for_data() / "genres"
+    return _GENRES_BASE
+
+# Ícono resuelto una vez al importar (un stat menos por ventana); relativo al
+# directorio de datos para que funcione también congelado con PyInstaller.
+_ICON_PATH = _BASE_DIR / "assets" / "app.ico"
+_HAS_ICON = _ICON_PATH.exists()
 
 def ensure_genre_dirs() -> None:
     gdir = app_genres_dir()
-    gdir.mkdir(parents=True, exist_ok=True)
+    try:
+        existing = {e.name for e in os.scandir(gdir)}
+    except OSError:
+        gdir.mkdir(parents=True, exist_ok=True)
+        existing = set()
+    # Crear solo lo que falta: en el caso estable no hay ningún mkdir
     for g in GENRES:
-        (gdir / g).mkdir(parents=True, exist_ok=True)
+        if g not in existing:
+            (gdir / g).mkdir(parents=True, exist_ok=True)
+
+# Rutas de género materializadas una vez; se indexan por la posición del combo
+_GENRE_DIRS = [app_genres_dir() / g for g in GENRES]
+
+_SLUG_KEEP = frozenset(string.ascii_lowercase + string.digits + '_-+')
+_SLUG_TABLE = str.maketrans({c: '-' for c in map(chr, range(128)) if c not in _SLUG_KEEP})
+_DASH_RE = re.compile(r'-{2,}')
 
 def _slug(s: str, max_len: int = 30) -> str:
-    s = s.lower().strip()
-    s = ''.join(ch if (ch.isalnum() or ch in ['_', '-', '+']) else '-' for ch in s)
-    s = re.sub('-{2,}', '-', s)
+    s = s.casefold().strip().translate(_SLUG_TABLE)
+    s = _DASH_RE.sub('-', s)
     return s[:max_len].strip('-_')
 
-def _is_audio_file(p: Path) -> bool:
-    try:
-        return p.is_file() and p.suffix.lower() in AUDIO_EXTS
-    except Exception:
-        return False
+def _is_audio_file(name_or_path) -> bool:
+    # Acepta str o Path; solo mira el sufijo (sin stat) para mantenerlo barato
+    # en los caminos calientes (drag&drop, escaneo de carpetas).
+    s = os.fspath(name_or_path)
+    i = s.rfind('.')
+    return i >= 0 and s[i:].lower() in AUDIO_EXTS
+
+def _reservoir_sample(it, n: int):
+    """Muestreo de yacimiento (Algorithm R): n elementos con O(n) de memoria,
+    sin materializar la secuencia completa."""
+    reservoir = []
+    for i, x in enumerate(it):
+        if i < n:
+            reservoir.append(x)
+        else:
+            j = random.randrange(i + 1)
+            if j < n:
+                reservoir[j] = x
+    return reservoir
+
+# Carpetas sin audio útil que no vale la pena recorrer
+_SKIP_DIRS = {'__MACOSX', 'node_modules', 'System Volume Information', '$RECYCLE.BIN'}
+
+# Matcher compilado para los escaneos masivos: decide en una pasada del motor
+# de regex, sin el .lower() (una asignación por nombre) del camino con set.
+_EXT_MATCH = re.compile(r'.+\.(?:wav|mp3|flac|ogg|m4a|aiff|aif)', re.IGNORECASE).fullmatch
+
+# Memo de escaneos recursivos: {(ruta, recursive): (mtime_ns, files)}.
+# El mtime de la raíz invalida drops/refreshes repetidos de la misma carpeta.
+_scan_cache = {}
 
 def _collect_audios_from_dir(folder: Path, recursive: bool = True):
-    files = []
+    root = os.fspath(folder)
     try:
-        if recursive:
-            for ext in AUDIO_EXTS:
-                files.extend(sorted(folder.rglob(f"*{ext}")))
-        else:
-            for child in sorted(folder.iterdir()):
-                if _is_audio_file(child):
-                    files.append(child)
-    except Exception:
-        pass
-    seen = set(); uniq = []
-    for f in files:
-        if f not in seen:
-            seen.add(f)
-            uniq.append(f)
-    return uniq
+        mtime = os.stat(root).st_mtime_ns
+    except OSError:
+        mtime = None
+    key = (root, recursive)
+    if mtime is not None:
+        cached = _scan_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            return list(cached[1])
+    files = []
+    stack = [root]
+    while stack:
+        d = stack.pop()
+        try:
+            with os.scandir(d) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not entry.name.startswith('.') \
+                                and entry.name not in _SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and _EXT_MATCH(entry.name):
+                        files.append(Path(entry.path))
+        except OSError:
+            continue
+    files.sort(key=os.fspath)
+    if mtime is not None:
+        if len(_scan_cache) >= 32:
+            _scan_cache.clear()
+        _scan_cache[key] = (mtime, files)
+        return list(files)
+    return files
 
 # ---------------- Widgets ----------------
 class ReadOnlyList(QListWidget):
     """
-    Lista para 'a_Género': muestra solo el nombre SIN extensión,
-    pero guarda la ruta completa en UserRole.
+    Lista para 'a_Género': muestra solo el nombre SIN extensión;
+    la ruta completa vive en _paths_list (misma posición que la fila).
     """
     def __init__(self):
         super().__init__()
         self.setAcceptDrops(False)
         self.setMinimumHeight(120)
         self.setAlternatingRowColors(True)
+        self.setUniformItemSizes(True)  # evita sizeHint por ítem en el layout
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(256)
+        self.setTextElideMode(Qt.ElideMiddle)
+        self._paths_list = []
+
+    def clear(self):
+        self._paths_list = []
+        super().clear()
 
     def set_paths(self, paths):
+        self.setUpdatesEnabled(False)
         self.clear()
-        for p in paths:
-            pp = Path(p)
-            it = QListWidgetItem(pp.stem)          # texto visible: sin extensión
-            it.setData(Qt.UserRole, str(pp))       # ruta completa
-            self.addItem(it)
+        self.append_paths(paths)
+        self.setUpdatesEnabled(True)
+
+    def append_paths(self, paths):
+        batch = [fspath(p) for p in paths]
+        self._paths_list.extend(batch)
+        self.addItems([Path(p).stem for p in batch])  # texto visible: sin extensión
+
+    def path_at(self, row: int):
+        if 0 <= row < len(self._paths_list):
+            return self._paths_list[row]
+        return None
 
     def paths(self):
-        out = []
-        for i in range(self.count()):
-            it = self.item(i)
-            out.append(it.data(Qt.UserRole) or it.text())
-        return out
+        return list(self._paths_list)
 
 class BasicMoldList(QListWidget):
     """Lista para moldes ad-hoc (b_Básico): muestra rutas completas, acepta archivos y carpetas."""
@@ -132,28 +233,70 @@ class BasicMoldList(QListWidget):
         self.setDragDropMode(QAbstractItemView.DropOnly)
         self.setDefaultDropAction(Qt.CopyAction)
         self.setDropIndicatorShown(True)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(256)
+        self.setTextElideMode(Qt.ElideMiddle)
+        self.setMovement(QListView.Static)
+        self._drag_mime_id = None
+        self._drag_accepted = False
+        self._paths_set = set()
+        self._paths_list = []
+
+    def clear(self):
+        self._paths_set.clear()
+        self._paths_list = []
+        super().clear()
 
     def _urls_to_paths(self, urls):
+        # Un solo os.stat por URL (exists/is_dir/is_file eran 3 syscalls)
         paths = []
         for url in urls:
-            p = Path(url.toLocalFile())
-            if not p.exists():
+            lp = url.toLocalFile()
+            try:
+                st = os.stat(lp)
+            except OSError:
                 continue
-            if p.is_dir():
-                paths.extend(_collect_audios_from_dir(p, recursive=True))
-            elif _is_audio_file(p):
-                paths.append(p)
+            if stat.S_ISDIR(st.st_mode):
+                paths.extend(_collect_audios_from_dir(Path(lp), recursive=True))
+            elif stat.S_ISREG(st.st_mode) and _is_audio_file(lp):
+                paths.append(Path(lp))
         return paths
 
+    def _urls_acceptable(self, urls):
+        # Validación barata para el cursor de drop: basta con un audio o una
+        # carpeta; el escaneo recursivo se hace recién en dropEvent.
+        for url in urls:
+            lp = url.toLocalFile()
+            if _is_audio_file(lp) or os.path.isdir(lp):
+                return True
+        return False
+
     def dragEnterEvent(self, event):
-        if event.mimeData().hasUrls() and self._urls_to_paths(event.mimeData().urls()):
+        md = event.mimeData()
+        self._drag_mime_id = id(md)
+        self._drag_accepted = md.hasUrls() and self._urls_acceptable(md.urls())
+        if self._drag_accepted:
             event.setDropAction(Qt.CopyAction); event.accept()
         else:
             event.ignore()
 
     def dragMoveEvent(self, event):
+        if id(event.mimeData()) == self._drag_mime_id:
+            if self._drag_accepted:
+                event.setDropAction(Qt.CopyAction); event.accept()
+            else:
+                event.ignore()
+            return
         self.dragEnterEvent(event)
 
+    def dragLeaveEvent(self, event):
+        # Invalida el cache del drag: el mismo id() de mimeData podría
+        # reutilizarse en un arrastre posterior distinto.
+        self._drag_mime_id = None
+        self._drag_accepted = False
+        super().dragLeaveEvent(event)
+
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
             new_paths = self._urls_to_paths(event.mimeData().urls())
@@ -163,16 +306,22 @@ class BasicMoldList(QListWidget):
         event.ignore()
 
     def add_files(self, paths):
-        existing = set(self.paths()); added = 0
+        existing = self._paths_set
+        batch = []
         for p in paths:
-            sp = str(p)
+            sp = fspath(p)
             if sp not in existing:
-                self.addItem(QListWidgetItem(sp))
-                existing.add(sp); added += 1
-        return added
+                batch.append(sp)
+                existing.add(sp)
+        if batch:
+            self._paths_list.extend(batch)
+            self.setUpdatesEnabled(False)
+            self.addItems(batch)
+            self.setUpdatesEnabled(True)
+        return len(batch)
 
     def paths(self):
-        return [self.item(i).text() for i in range(self.count())]
+        return list(self._paths_list)
 
 class DestDropList(QListWidget):
     """Lista que acepta arrastrar y soltar archivo destino."""
@@ -186,41 +335,107 @@ class DestDropList(QListWidget):
         self.setDragDropMode(QAbstractItemView.DropOnly)
         self.setDefaultDropAction(Qt.CopyAction)
         self.setDropIndicatorShown(True)
+        self.setUniformItemSizes(True)
+        self._drag_mime_id = None
+        self._drag_accepted = False
+        self._paths_list = []
+
+    def clear(self):
+        self._paths_list = []
+        super().clear()
+
+    def set_path(self, path: str):
+        self.clear()
+        self._paths_list = [path]
+        self.addItem(QListWidgetItem(path))
+
+    def paths(self):
+        return list(self._paths_list)
 
     def _urls_have_valid_audio(self, urls):
-        for url in urls:
-            p = Path(url.toLocalFile())
-            if _is_audio_file(p):
-                return True
-        return False
+        return any(_is_audio_file(u.toLocalFile()) for u in urls)
 
     def dragEnterEvent(self, event):
-        if event.mimeData().hasUrls() and self._urls_have_valid_audio(event.mimeData().urls()):
+        md = event.mimeData()
+        self._drag_mime_id = id(md)
+        self._drag_accepted = md.hasUrls() and self._urls_have_valid_audio(md.urls())
+        if self._drag_accepted:
             event.setDropAction(Qt.CopyAction); event.accept()
         else:
             event.ignore()
 
     def dragMoveEvent(self, event):
+        if id(event.mimeData()) == self._drag_mime_id:
+            if self._drag_accepted:
+                event.setDropAction(Qt.CopyAction); event.accept()
+            else:
+                event.ignore()
+            return
         self.dragEnterEvent(event)
 
+    def dragLeaveEvent(self, event):
+        self._drag_mime_id = None
+        self._drag_accepted = False
+        super().dragLeaveEvent(event)
+
     def dropEvent(self, event):
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
-                p = Path(url.toLocalFile())
-                if _is_audio_file(p):
-                    self.clear()
-                    self.addItem(QListWidgetItem(str(p)))
+                lp = url.toLocalFile()
+                if _is_audio_file(lp):
+                    self.set_path(lp)
                     event.setDropAction(Qt.CopyAction); event.accept(); return
         event.ignore()
 
-class Worker(QThread):
+class _ScanSignals(QObject):
+    batch_ready = Signal(list)
+    finished = Signal(list)
+
+class _ScanRunnable(QRunnable):
+    """Ejecuta un escaneo de disco en el pool global y emite la lista resultante.
+
+    Con batch_size > 0 y un fn generador, va emitiendo batch_ready a medida
+    que aparecen resultados (listado progresivo); finished siempre lleva la
+    lista completa.
+    """
+    def __init__(self, fn, batch_size=0):
+        super().__init__()
+        self.fn = fn
+        self.batch_size = batch_size
+        self.signals = _ScanSignals()
+
+    def run(self):
+        files = []
+        batch = []
+        try:
+            for p in self.fn():
+                files.append(p)
+                if self.batch_size:
+                    batch.append(p)
+                    if len(batch) >= self.batch_size:
+                        self.signals.batch_ready.emit(batch)
+                        batch = []
+        except Exception:
+            pass
+        if batch:
+            self.signals.batch_ready.emit(batch)
+        self.signals.finished.emit(files)
+
+class WorkerSignals(QObject):
     progressed = Signal(int)
     logged = Signal(str)
     finished_ok = Signal(str)
     failed = Signal(str)
 
+class Worker(QRunnable):
+    """Trabajo de procesamiento ejecutado en el QThreadPool global.
+
+    QRunnable en vez de QThread: reutiliza hilos del pool y no deja
+    objetos-hilo acumulados tras cada Procesar.
+    """
     def __init__(self, dest_path, mold_paths, out_path, cfg):
         super().__init__()
+        self.signals = WorkerSignals()
         self.dest_path = dest_path
         self.mold_paths = mold_paths
         self.out_path = out_path
@@ -228,14 +443,38 @@ class Worker(QThread):
 
     def run(self):
         try:
-            def _p(v): self.progressed.emit(int(v))
-            def _l(msg): self.logged.emit(str(msg))
+            try:
+                from engine import apply_envelopes
+            except Exception:
+                apply_envelopes = _dummy_apply_envelopes
+
+            # Gate a ~20 Hz: evita inundar el event loop con señales encoladas
+            last_v = -1
+            last_t = 0.0
+            def _p(v):
+                nonlocal last_v, last_t
+                iv = int(v)
+                now = time.monotonic()
+                if iv != last_v and (iv == 100 or now - last_t > 0.05):
+                    self.signals.progressed.emit(iv)
+                    last_v = iv
+                    last_t = now
+            def _l(msg): self.signals.logged.emit(str(msg))
             _l("Iniciando procesamiento…")
             apply_envelopes(self.dest_path, self.mold_paths, self.out_path, self.cfg, _p, _l)
-            self.finished_ok.emit(self.out_path)
+            self.signals.finished_ok.emit(self.out_path)
         except Exception:
             tb = traceback.format_exc()
-            self.failed.emit(tb)
+            self.signals.failed.emit(tb)
+
+class _EngineWarmup(QThread):
+    """Pre-importa el engine en segundo plano una vez mostrada la ventana."""
+    def run(self):
+        try:
+            import engine
+            engine.prewarm()  # compila los kernels JIT antes del primer Procesar
+        except Exception:
+            pass
 
 # ---------------- Ventana principal ----------------
 class MainWin(QWidget):
@@ -244,18 +483,51 @@ class MainWin(QWidget):
         self.setWindowTitle("Copy Envelope")
         self.setAcceptDrops(True)  # solo actuará en a_Género (ver dragEnterEvent)
 
-        ensure_genre_dirs()
+        # Bootstrap de carpetas de géneros fuera del hilo de la GUI; los
+        # consumidores (refresh_current_folder) ya hacen mkdir por su cuenta.
+        QThreadPool.globalInstance().start(ensure_genre_dirs)
 
         self.player = QMediaPlayer(self)
-        self.audio = QAudioOutput(self)
+        # Dispositivo explícito: evita que el backend resuelva la salida por
+        # defecto (y su buffering heurístico) en la primera reproducción.
+        self.audio = QAudioOutput(QMediaDevices.defaultAudioOutput(), self)
         self.player.setAudioOutput(self.audio)
         self.audio.setVolume(0.9)
         self._duration = 0
         self._autoplay_pending = False
-
-        icon_path = Path("assets/app.ico")
-        if icon_path.exists():
-            self.setWindowIcon(QIcon(str(icon_path)))
+        self._player_dirty = False  # recrear el player solo tras un error del backend
+        # Estado para limitar el repintado de la etiqueta de tiempo (~4 Hz)
+        self._last_label_ms = 0
+        self._last_slider_ms = 0
+        self._dur_str = "00:00"
+
+        # Debounce de pre-escucha: al recorrer la lista con el teclado solo se
+        # carga el archivo donde el usuario se detiene.
+        self._pending_preview_path = None
+        self._pending_preview_list = None
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.timeout.connect(self._do_preview_load)
+
+        # Cache de listados por carpeta de género, invalidado por mtime
+        self._genre_cache = {}
+        # Generación del escaneo en curso (descarta resultados obsoletos)
+        self._scan_gen = 0
+        # Cache de slugs para el auto-nombrado (mismos moldes entre corridas)
+        self._slug_cache = {}
+        # Último parseo de weights: (texto, ndarray)
+        self._weights_cache = None
+
+        # Coalescencia de logs: una sola appendPlainText por ráfaga
+        self._log_buffer = []
+        self._log_timer = QTimer(self)
+        self._log_timer.setSingleShot(True)
+        self._log_timer.setInterval(80)
+        self._log_timer.timeout.connect(self._flush_logs)
+
+        if _HAS_ICON:
+            self.setWindowIcon(QIcon(str(_ICON_PATH)))
 
         root = QVBoxLayout(self)
 
@@ -326,8 +598,35 @@ class MainWin(QWidget):
         self.ed_attack = QLineEdit("1.0")
         self.ed_release = QLineEdit("0.5")
         self.ed_floor_db = QLineEdit("-40.0")
-        self.ed_mode = QLineEdit("hilbert")
-        self.ed_combine = QLineEdit("max")
+        # Validadores + cache de floats: el parseo ocurre al editar, no en on_run
+        self._bpm = 100.0
+        self._attack_ms = 1.0
+        self._release_ms = 0.5
+        self._floor_db = -40.0
+        for ed, attr, lo, hi, default in (
+            (self.ed_bpm, '_bpm', 1.0, 999.0, 100.0),
+            (self.ed_attack, '_attack_ms', 0.0, 10000.0, 1.0),
+            (self.ed_release, '_release_ms', 0.0, 10000.0, 0.5),
+            (self.ed_floor_db, '_floor_db', -120.0, 0.0, -40.0),
+        ):
+            v = QDoubleValidator(lo, hi, 2, self)
+            v.setNotation(QDoubleValidator.StandardNotation)
+            # Locale C fijo: el cacher parsea con float(), que solo entiende
+            # punto decimal; sin esto, en locales de coma el validator acepta
+            # "1,5" (que float() no parsea) y deja "1.5" en Intermediate.
+            loc = QLocale.c()
+            loc.setNumberOptions(QLocale.RejectGroupSeparator)
+            v.setLocale(loc)
+            ed.setValidator(v)
+            ed.editingFinished.connect(self._make_float_cacher(ed, attr, default))
+        # Combos con la clave canónica en userData: on_run lee currentData()
+        # sin strip/lower ni riesgo de valores mal tipeados.
+        self.cb_mode = QComboBox()
+        for key in ("hilbert", "rms"):
+            self.cb_mode.addItem(key, key)
+        self.cb_combine = QComboBox()
+        for key in ("max", "mean", "geom_mean", "product", "sum_limited", "weighted"):
+            self.cb_combine.addItem(key, key)
         self.ed_weights = QLineEdit("")
 
         # Campo salida + "…" + Abrir carpeta
@@ -343,8 +642,8 @@ class MainWin(QWidget):
         lf.addRow("Attack ms:", self.ed_attack)
         lf.addRow("Release ms:", self.ed_release)
         lf.addRow("Floor dB:", self.ed_floor_db)
-        lf.addRow("Envelope mode:", self.ed_mode)
-        lf.addRow("Combine mode:", self.ed_combine)
+        lf.addRow("Envelope mode:", self.cb_mode)
+        lf.addRow("Combine mode:", self.cb_combine)
         lf.addRow("Weights (coma):", self.ed_weights)
         lf.addRow("Archivo de salida:", out_row)
 
@@ -388,7 +687,7 @@ class MainWin(QWidget):
 
         # Progreso & Logs
         self.progress = QProgressBar(); self.progress.setRange(0, 100); root.addWidget(self.progress)
-        self.logs = QPlainTextEdit(); self.logs.setReadOnly(True); self.logs.setMaximumBlockCount(5000); root.addWidget(self.logs)
+        self.logs = QPlainTextEdit(); self.logs.setReadOnly(True); self.logs.setMaximumBlockCount(2000); root.addWidget(self.logs)
 
         # Botón procesar
         hb = QHBoxLayout()
@@ -404,7 +703,7 @@ class MainWin(QWidget):
         self.cb_genre.currentIndexChanged.connect(self.on_genre_changed)
         self.btn_open_folder.clicked.connect(self.on_open_folder)
         self.btn_pick_random.clicked.connect(self.pick_random_n)
-        self.btn_refresh.clicked.connect(self.refresh_current_folder)
+        self.btn_refresh.clicked.connect(lambda: self.refresh_current_folder(force=True))
 
         # Señales (Básico)
         self.btn_basic_add_files.clicked.connect(self.basic_add_files)
@@ -439,11 +738,7 @@ class MainWin(QWidget):
     # --- Drag & drop a nivel ventana ---
     # Activo solo para a_Género (en b_Básico se usa drop por zonas)
     def _urls_have_valid_audio(self, urls):
-        for url in urls:
-            p = Path(url.toLocalFile())
-            if _is_audio_file(p):
-                return True
-        return False
+        return any(_is_audio_file(u.toLocalFile()) for u in urls)
 
     def dragEnterEvent(self, event):
         if self.tabs.currentWidget() is self.tab_genre and event.mimeData().hasUrls() and self._urls_have_valid_audio(event.mimeData().urls()):
@@ -454,26 +749,66 @@ class MainWin(QWidget):
     def dropEvent(self, event):
         if self.tabs.currentWidget() is self.tab_genre and event.mimeData().hasUrls():
             for url in event.mimeData().urls():
-                p = Path(url.toLocalFile())
-                if _is_audio_file(p):
-                    self.dest_list.clear()
-                    self.dest_list.addItem(QListWidgetItem(str(p)))
+                lp = url.toLocalFile()
+                if _is_audio_file(lp):
+                    self.dest_list.set_path(lp)
                     event.setDropAction(Qt.CopyAction); event.accept(); return
         event.ignore()
 
     # -------- utilidades de UI --------
+    def _make_float_cacher(self, ed, attr, default):
+        def _cache():
+            try:
+                setattr(self, attr, float(ed.text()))
+            except ValueError:
+                setattr(self, attr, default)
+        return _cache
+
     def append_log(self, text):
-        self.logs.appendPlainText(text)
+        self._log_buffer.append(text)
+        if not self._log_timer.isActive():
+            self._log_timer.start()
+
+    def _flush_logs(self):
+        if self._log_buffer:
+            self.logs.appendPlainText("\n".join(self._log_buffer))
+            self._log_buffer.clear()
 
     def _current_genre_dir(self) -> Path:
-        return app_genres_dir() / self.cb_genre.currentText()
+        return _GENRE_DIRS[self.cb_genre.currentIndex()]
 
-    def _list_audio_files(self, folder: Path):
+    def _iter_genre_files(self, folder: Path, force: bool = False):
+        """Genera los audios de la carpeta a medida que aparecen.
+
+        Si el cache por mtime está fresco se reproduce directamente; un escaneo
+        frío repuebla el cache (ordenado) al terminar.
+        """
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return
+        key = os.fspath(folder)
+        if not force:
+            cached = self._genre_cache.get(key)
+            if cached is not None and cached[0] == mtime:
+                yield from cached[1]
+                return
         files = []
-        if folder.exists():
-            for child in sorted(folder.iterdir()):
-                if _is_audio_file(child):
-                    files.append(child)
+        try:
+            with os.scandir(folder) as it:
+                for e in it:
+                    if e.is_file(follow_symlinks=False) and _EXT_MATCH(e.name):
+                        p = Path(e.path)
+                        files.append(p)
+                        yield p
+        except OSError:
+            pass
+        files.sort(key=os.fspath)
+        self._genre_cache[key] = (mtime, files)
+
+    def _list_audio_files(self, folder: Path, force: bool = False):
+        files = list(self._iter_genre_files(folder, force=force))
+        files.sort(key=os.fspath)
         return files
 
     def on_genre_changed(self):
@@ -484,23 +819,45 @@ class MainWin(QWidget):
         folder.mkdir(parents=True, exist_ok=True)
         QDesktopServices.openUrl(QUrl.fromLocalFile(str(folder)))
 
-    def refresh_current_folder(self, pick_random=False):
+    def refresh_current_folder(self, pick_random=False, force=False):
         folder = self._current_genre_dir()
         folder.mkdir(parents=True, exist_ok=True)
-        files = self._list_audio_files(folder)
+        # Contador de generación: si el usuario cambia de género antes de que
+        # termine un escaneo, los resultados viejos se descartan al llegar.
+        self._scan_gen += 1
+        gen = self._scan_gen
         if pick_random:
-            self._set_random_n(files, self.spn_count.value())
+            n = max(1, int(self.spn_count.value()))
+            task = _ScanRunnable(
+                lambda: _reservoir_sample(self._iter_genre_files(folder, force=force), n))
+            task.signals.finished.connect(
+                lambda files: self._on_random_picked(files) if gen == self._scan_gen else None)
         else:
-            self.mold_list.set_paths(files)
-
-    def _set_random_n(self, files, n):
+            # Listado progresivo: los primeros resultados aparecen sin esperar
+            # a que termine el escaneo completo.
+            self.mold_list.clear()
+            task = _ScanRunnable(lambda: self._iter_genre_files(folder, force=force),
+                                 batch_size=100)
+            task.signals.batch_ready.connect(
+                lambda batch: self.mold_list.append_paths(batch) if gen == self._scan_gen else None)
+            task.signals.finished.connect(
+                lambda files: self._finish_mold_scan(files) if gen == self._scan_gen else None)
+        self._scan_task = task  # mantener vivas las señales hasta que emita
+        QThreadPool.globalInstance().start(task)
+
+    def _finish_mold_scan(self, files):
+        # Un escaneo frío llega en orden crudo de scandir; al terminar se
+        # reordena para que coincida con los refrescos servidos desde cache.
+        ordered = [fspath(p) for p in sorted(files, key=os.fspath)]
+        if ordered != self.mold_list.paths():
+            self.mold_list.set_paths(ordered)
+
+    def _on_random_picked(self, files):
         if not files:
             self.mold_list.clear()
             QMessageBox.warning(self, "Sin samples", "No hay archivos de audio en la carpeta del género seleccionado.")
             return
-        n = max(1, int(n))
-        chosen = files if len(files) <= n else random.sample(files, n)
-        self.mold_list.set_paths(chosen)
+        self.mold_list.set_paths(files)
 
     # ---- botón Elegir N al azar ----
     def pick_random_n(self):
@@ -520,7 +877,16 @@ class MainWin(QWidget):
     def basic_add_dir(self):
         d = QFileDialog.getExistingDirectory(self, "Elegir carpeta de moldes", str(Path.cwd()))
         if d:
-            paths = _collect_audios_from_dir(Path(d), recursive=True)
+            # Deshabilitar hasta terminar para no encolar escaneos duplicados
+            self.btn_basic_add_dir.setEnabled(False)
+            task = _ScanRunnable(lambda: _collect_audios_from_dir(Path(d), recursive=True))
+            task.signals.finished.connect(self._on_basic_dir_scanned)
+            self._basic_scan_task = task
+            QThreadPool.globalInstance().start(task)
+
+    def _on_basic_dir_scanned(self, paths):
+        self.btn_basic_add_dir.setEnabled(True)
+        if paths:
             self.basic_list.add_files(paths)
 
     # -------- Pre-escucha compartida --------
@@ -538,6 +904,8 @@ class MainWin(QWidget):
             self.append_log(f"[Audio] conectar señales: {e}")
 
     def _recreate_player(self):
+        # Solo como recuperación ante errores del backend; el camino normal
+        # reutiliza el player existente (ver _load_player_source).
         try: vol = self.audio.volume() if hasattr(self, 'audio') and self.audio else 0.9
         except Exception: vol = 0.9
         try: self.player.stop()
@@ -547,7 +915,7 @@ class MainWin(QWidget):
         try: self.audio.deleteLater()
         except Exception: pass
         self.player = QMediaPlayer(self)
-        self.audio = QAudioOutput(self)
+        self.audio = QAudioOutput(QMediaDevices.defaultAudioOutput(), self)
         self.audio.setVolume(vol)
         self.player.setAudioOutput(self.audio)
         self._duration = 0
@@ -555,17 +923,23 @@ class MainWin(QWidget):
         self._connect_player_signals()
 
     def _fmt_ms(self, ms: int) -> str:
-        ms = int(ms or 0); s = ms // 1000; m = s // 60; s = s % 60
-        return f"{m:02}:{s:02}"
+        m, s = divmod((ms or 0) // 1000, 60)
+        return f"{m:02d}:{s:02d}"
 
     def _load_player_source(self, path: Path):
         try:
-            self._recreate_player()
-            self.player.setSource(QUrl.fromLocalFile(str(path)))
+            # Reutilizar el mismo QMediaPlayer/QAudioOutput: recrearlos por
+            # selección asigna recursos de audio del SO en cada click.
+            if self._player_dirty:
+                self._recreate_player()
+                self._player_dirty = False
+            self.player.stop()
+            self.player.setSource(QUrl())  # reset barato del backend
+            self._duration = 0
             self.sld_pos.setRange(0, 0)
             self.lbl_time.setText("00:00 / 00:00")
-            if self._autoplay_pending:
-                QTimer.singleShot(200, self.on_play)
+            self.player.setSource(QUrl.fromLocalFile(fspath(path)))
+            # autoplay: on_media_status dispara on_play al quedar cargado el medio
         except Exception as e:
             self.append_log(f"[Audio] No se pudo cargar: {path} -> {e}")
 
@@ -573,9 +947,30 @@ class MainWin(QWidget):
         if curr is None:
             return
         if which_list is self.mold_list:
-            p = Path(curr.data(Qt.UserRole) or curr.text())
+            p = Path(self.mold_list.path_at(self.mold_list.row(curr)) or curr.text())
         else:
             p = Path(curr.text())
+        self._pending_preview_path = p
+        self._pending_preview_list = which_list
+        self._preview_timer.start()  # reinicia el debounce en cada cambio
+
+    def _do_preview_load(self):
+        p = self._pending_preview_path
+        if p is None:
+            return
+        # Si la selección cambió mientras corría el debounce, no cargar nada:
+        # el próximo timeout ya traerá la ruta vigente.
+        lst = getattr(self, '_pending_preview_list', None)
+        if lst is not None:
+            curr = lst.currentItem()
+            if curr is None:
+                return
+            if lst is self.mold_list:
+                now = self.mold_list.path_at(self.mold_list.row(curr)) or curr.text()
+            else:
+                now = curr.text()
+            if Path(now) != p:
+                return
         self._autoplay_pending = bool(self.chk_autoplay.isChecked())
         self._load_player_source(p)
 
@@ -600,19 +995,28 @@ class MainWin(QWidget):
 
     def on_pos_changed(self, pos):
         try:
+            # positionChanged llega a 50-100 Hz; el slider no necesita más de ~20 fps
+            if abs(pos - self._last_slider_ms) < 50:
+                return
+            self._last_slider_ms = pos
             self.sld_pos.blockSignals(True)
             self.sld_pos.setValue(int(pos))
             self.sld_pos.blockSignals(False)
-            dur = int(self.player.duration())
-            self.lbl_time.setText(f"{self._fmt_ms(pos)} / {self._fmt_ms(dur)}")
+            # La etiqueta solo necesita actualizarse ~4 veces por segundo
+            if abs(pos - self._last_label_ms) >= 250:
+                self._last_label_ms = pos
+                self.lbl_time.setText(f"{self._fmt_ms(pos)} / {self._dur_str}")
         except Exception:
             pass
 
     def on_dur_changed(self, dur):
         try:
             self._duration = int(dur)
+            self._dur_str = self._fmt_ms(self._duration)
+            self._last_label_ms = 0
+            self._last_slider_ms = -1000  # fuerza el primer update del slider
             self.sld_pos.setRange(0, self._duration)
-            self.lbl_time.setText(f"{self._fmt_ms(self.player.position())} / {self._fmt_ms(dur)}")
+            self.lbl_time.setText(f"{self._fmt_ms(self.player.position())} / {self._dur_str}")
         except Exception:
             pass
 
@@ -628,6 +1032,7 @@ class MainWin(QWidget):
         try:
             err_text = self.player.errorString() if hasattr(self.player, 'errorString') else None
             self.append_log(f"[Audio] error: {args} {('-> ' + err_text) if err_text else ''}")
+            self._player_dirty = True  # la próxima carga recrea el backend
         except Exception:
             pass
 
@@ -636,10 +1041,16 @@ class MainWin(QWidget):
         f, _ = QFileDialog.getOpenFileName(self, "Elegir destino", str(Path.cwd()),
                                           "Audio (*.wav *.mp3 *.flac *.ogg *.m4a *.aiff *.aif)")
         if f:
-            self.dest_list.clear()
-            self.dest_list.addItem(QListWidgetItem(f))
+            self.dest_list.set_path(f)
 
     # -------- ejecutar --------
+    def _cached_slug(self, s: str, max_len: int) -> str:
+        key = (s, max_len)
+        v = self._slug_cache.get(key)
+        if v is None:
+            v = self._slug_cache[key] = _slug(s, max_len)
+        return v
+
     def _active_mold_paths(self):
         current = self.tabs.currentWidget()
         if current is self.tab_basic:
@@ -647,57 +1058,82 @@ class MainWin(QWidget):
         return self.mold_list.paths()
 
     def on_run(self):
+        # Validación en una sola pasada: se junta todo y se muestra un único
+        # diálogo (cada QMessageBox modal re-entra en el event loop).
+        errors = []
         molds = self._active_mold_paths()
+        # Dedupe preservando orden: procesar dos veces el mismo molde es trabajo
+        # de DSP tirado (p. ej. la misma carpeta arrastrada dos veces).
+        seen = set()
+        molds = [m for m in molds if not (m in seen or seen.add(m))]
         if not molds:
-            QMessageBox.warning(self, "Faltan moldes", "No hay moldes seleccionados.")
-            return
-        dests = [self.dest_list.item(i).text() for i in range(self.dest_list.count())]
+            errors.append("No hay moldes seleccionados.")
+        dests = self.dest_list.paths()
         if not dests:
-            QMessageBox.warning(self, "Falta destino", "Elige o arrastra el archivo destino.")
-            return
-        dest = dests[0]
+            errors.append("Elige o arrastra el archivo destino.")
         out = self.ed_out.text().strip()
-        ext = Path(out).suffix if out else ".wav"
-        if self.chk_auto_name.isChecked():
-            out_dir = Path(out).parent if out else Path(dest).parent
-            out_dir.mkdir(parents=True, exist_ok=True)
-            dest_base = _slug(Path(dest).stem, 20)
-            mold_names = [(_slug(Path(p).stem, 12)[:4] or 'xxxx') for p in molds]
-            mold_part = "+".join(mold_names)
-            if len(mold_part) > 40: mold_part = mold_part[:40]
-            out = str(out_dir / f"{dest_base}__{mold_part}{ext}")
-        elif not out:
-            QMessageBox.warning(self, "Falta salida", "Especifica el archivo de salida (ej: salida.wav).")
-            return
+        if not self.chk_auto_name.isChecked() and not out:
+            errors.append("Especifica el archivo de salida (ej: salida.wav).")
 
         weights = None
         wtxt = self.ed_weights.text().strip()
         if wtxt:
-            try:
-                weights = [float(x) for x in wtxt.split(",")]
-            except Exception:
-                QMessageBox.warning(self, "Weights inválidos", "Usa números separados por coma, ej: 1,0.8,1.2")
-                return
+            # Cache: el texto no suele cambiar entre corridas consecutivas.
+            # Parseo puro-Python: sin numpy la app sigue funcionando en modo
+            # dummy, y el engine convierte la lista a array cuando le toca.
+            cached = self._weights_cache
+            if cached is not None and cached[0] == wtxt:
+                weights = cached[1]
+            else:
+                try:
+                    weights = [float(x) for x in wtxt.split(",")]
+                    self._weights_cache = (wtxt, weights)
+                except ValueError:
+                    weights = None
+                    errors.append("Weights inválidos: usa números separados por coma, ej: 1,0.8,1.2")
 
         cfg = {
-            "bpm": float(self.ed_bpm.text() or 100),
-            "attack_ms": float(self.ed_attack.text() or 1.0),
-            "release_ms": float(self.ed_release.text() or 0.5),
-            "floor_db": float(self.ed_floor_db.text() or -40.0),
-            "mode": (self.ed_mode.text() or "hilbert").strip().lower(),
-            "combine_mode": (self.ed_combine.text() or "max").strip().lower(),
+            "bpm": self._bpm,
+            "attack_ms": self._attack_ms,
+            "release_ms": self._release_ms,
+            "floor_db": self._floor_db,
+            "mode": self.cb_mode.currentData(),
+            "combine_mode": self.cb_combine.currentData(),
             "weights": weights,
             "match_lufs": False,
         }
 
-        self.progress.setValue(0); self.logs.clear()
+        if errors:
+            QMessageBox.warning(self, "Revisa", "\n".join(errors))
+            return
+
+        dest = dests[0]
+        ext = Path(out).suffix if out else ".wav"
+        if self.chk_auto_name.isChecked():
+            out_dir = Path(out).parent if out else Path(dest).parent
+            out_dir.mkdir(parents=True, exist_ok=True)
+            dest_base = self._cached_slug(os.path.splitext(os.path.basename(dest))[0], 20)
+            # Acumulación corta-circuito: deja de sluggear al llenar los 40 chars
+            mold_names = []
+            total = 0
+            for p in molds:
+                s = self._cached_slug(os.path.splitext(os.path.basename(p))[0], 12)[:4] or 'xxxx'
+                add = len(s) + (1 if mold_names else 0)
+                if total + add > 40:
+                    break
+                mold_names.append(s)
+                total += add
+            mold_part = "+".join(mold_names)
+            out = fspath(out_dir / f"{dest_base}__{mold_part}{ext}")
+
+        self.progress.setValue(0); self._log_buffer.clear(); self.logs.clear()
 
         self.worker = Worker(dest, molds, out, cfg)
-        self.worker.progressed.connect(self.progress.setValue)
-        self.worker.logged.connect(self.append_log)
-        self.worker.finished_ok.connect(self.on_done)
-        self.worker.failed.connect(self.on_fail)
-        self.worker.start()
+        self.worker.signals.progressed.connect(self.progress.setValue)
+        self.worker.signals.logged.connect(self.append_log)
+        self.worker.signals.finished_ok.connect(self.on_done)
+        self.worker.signals.failed.connect(self.on_fail)
+        QThreadPool.globalInstance().start(self.worker)
 
     def on_done(self, out_path):
         self.append_log(f"OK: {out_path}")
@@ -741,6 +1177,8 @@ def main():
     win = MainWin()
     win.resize(980, 840)
     win.show()
+    win._engine_warmup = _EngineWarmup()
+    win._engine_warmup.start()
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -1,11 +1,15 @@
 from __future__ import annotations
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Callable, Dict, Optional
 
 import numpy as np
 import soundfile as sf
 import librosa
-from scipy.signal import hilbert
+from scipy.signal import lfilter
+import scipy.fft as sfft
 
 # Optional loudness match
 try:
@@ -14,14 +18,122 @@ try:
 except Exception:
     _HAS_LOUD = False
 
+# Optional fused+threaded array expressions
+try:
+    import numexpr as ne
+    _HAS_NE = True
+except Exception:
+    _HAS_NE = False
+
+# Optional JIT for the per-sample smoothing loops
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+if _HAS_NUMBA:
+    @njit(cache=True, fastmath=True)
+    def _smooth_ar(env, inv_atk, inv_rel, out):
+        # one-pole attack (forward) + release (backward) smoothing
+        prev = env[0]
+        for i in range(env.size):
+            prev += (env[i] - prev) * inv_atk
+            out[i] = prev
+        prev = out[-1]
+        for i in range(env.size - 1, -1, -1):
+            prev += (out[i] - prev) * inv_rel
+            out[i] = prev
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _combine_max(E, out):
+        # máximo por muestra en una pasada: cada muestra se lee una sola vez
+        M, N = E.shape
+        for i in prange(N):
+            m = E[0, i]
+            for k in range(1, M):
+                v = E[k, i]
+                if v > m:
+                    m = v
+            out[i] = m
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _combine_weighted(E, w, inv_wsum, out):
+        M, N = E.shape
+        for i in prange(N):
+            s = 0.0
+            for k in range(M):
+                s += E[k, i] * w[k]
+            out[i] = s * inv_wsum
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def _combine_sum_limited(E, out):
+        # suma y máximo por columna en una sola pasada; tope 1.5x del máximo
+        M, N = E.shape
+        for i in prange(N):
+            s = 0.0
+            m = E[0, i]
+            for k in range(M):
+                v = E[k, i]
+                s += v
+                if v > m:
+                    m = v
+            lim = 1.5 * m
+            out[i] = s if s < lim else lim
+
+def prewarm() -> None:
+    """Compile the jitted kernels on a tiny dummy signal.
+
+    Called from the GUI's background warmup thread so the first real run
+    doesn't pay Numba's compile latency. With cache=True the compiled
+    objects persist in __pycache__, making later startups near-instant.
+    """
+    if not _HAS_NUMBA:
+        return
+    try:
+        # float32: el pipeline entero corre en float32, compilar esa
+        # especialización (linspace por defecto daría la de float64)
+        dummy = np.linspace(0.0, 1.0, 1024, dtype=np.float32)
+        _smooth_ar(dummy, 0.01, 0.01, np.empty_like(dummy))
+        E = np.ascontiguousarray(np.stack((dummy, dummy)))
+        out = np.empty_like(dummy)
+        _combine_max(E, out)
+        _combine_weighted(E, np.ones(2, dtype=E.dtype), 0.5, out)
+        _combine_sum_limited(E, out)
+    except Exception:
+        pass
+
 def db_to_lin(db: float) -> float:
     return 10.0 ** (db / 20.0)
 
 def lin_to_db(x: np.ndarray, eps: float = 1e-12) -> np.ndarray:
+    if _HAS_NE and isinstance(x, np.ndarray) and x.size > 4096:
+        # numexpr fusiona abs/clip/log10 en una sola pasada multihilo.
+        return ne.evaluate(
+            "20.0 * log10(where(abs(x) < eps, eps, abs(x)))",
+            local_dict={"x": x, "eps": eps},
+        )
     return 20.0 * np.log10(np.clip(np.abs(x), eps, None))
 
 def load_audio(path: str, sr_target: Optional[int] = None):
-    y, sr = librosa.load(path, sr=sr_target, mono=False)  # preserve channels then mix later
+    # Camino rápido: soundfile decodifica directo a float32 sin pasar por el
+    # mono-mix/resample de librosa.load; solo se resamplea si el SR difiere
+    # (soxr es ~10x más rápido que el resampy por defecto).
+    try:
+        info = sf.info(path)
+    except Exception:
+        info = None
+    if info is not None:
+        if hasattr(path, "seek"):
+            path.seek(0)
+        y, sr = sf.read(path, dtype="float32", always_2d=True)
+        y = y.T  # (C, N)
+        if sr_target is not None and sr_target != sr:
+            y = librosa.resample(y, orig_sr=sr, target_sr=sr_target, res_type="soxr_hq")
+            sr = sr_target
+        return y, sr
+    # Fallback para formatos que soundfile no abre (mp3 exóticos vía audioread)
+    y, sr = librosa.load(path, sr=sr_target, mono=False)
     if y.ndim == 1:
         y = y[np.newaxis, :]  # (C=1, N)
     return y, sr
@@ -32,68 +144,164 @@ def to_mono(y: np.ndarray) -> np.ndarray:
     return np.mean(y, axis=0)
 
 def envelope_hilbert(y: np.ndarray) -> np.ndarray:
-    # analytic envelope
-    return np.abs(hilbert(y))
+    # Envolvente analítica vía rfft: la mitad de datos espectrales que el
+    # fft+ifft complejo de scipy.signal.hilbert, y FFTs multihilo.
+    n = y.shape[-1]
+    # Pad a una longitud 5-smooth: una FFT de largo primo puede ser órdenes
+    # de magnitud más lenta que la del siguiente largo compuesto.
+    nfft = sfft.next_fast_len(n)
+    X = sfft.rfft(y, n=nfft, workers=-1)
+    X *= -1j  # espectro del transformado de Hilbert: -j*sign(f)
+    X[0] = 0.0
+    if nfft % 2 == 0:
+        X[-1] = 0.0  # Nyquist
+    h = sfft.irfft(X, n=nfft, workers=-1)[:n]
+    # sqrt(y² + h²) con ufuncs in-place: SIMD y una sola pasada extra de
+    # memoria, frente al loop escalar con manejo de overflow de np.hypot.
+    tmp = np.empty_like(h)
+    np.multiply(y, y, out=tmp)
+    np.multiply(h, h, out=h)
+    h += tmp
+    np.sqrt(h, out=h)
+    return h
 
 def envelope_rms(y: np.ndarray, frame: int = 2048, hop: int = 512) -> np.ndarray:
-    # frame RMS, then upsample to length
-    rms = librosa.feature.rms(y=y, frame_length=frame, hop_length=hop, center=True)[0]
-    env = librosa.util.fix_length(np.repeat(rms, hop), size=y.shape[-1])
-    return env
+    # RMS por frame sobre vistas con stride (sin copiar los frames) y el
+    # cuadrado-suma fusionado en einsum; upsample vía broadcast_to en lugar
+    # del np.repeat materializado + fix_length de librosa.
+    n = y.shape[-1]
+    pad = frame // 2
+    yp = np.pad(y, (pad, pad))  # equivale al center=True de librosa
+    frames = np.lib.stride_tricks.sliding_window_view(yp, frame)[::hop]
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / np.float32(frame))
+    env = np.broadcast_to(rms[:, None], (rms.size, hop)).reshape(-1)
+    if env.size >= n:
+        return np.ascontiguousarray(env[:n])
+    return np.pad(env, (0, n - env.size), mode="edge")
 
 def smooth_envelope(env: np.ndarray, sr: int, attack_ms: float, release_ms: float) -> np.ndarray:
     atk = max(1, int(sr * (attack_ms / 1000.0)))
     rel = max(1, int(sr * (release_ms / 1000.0)))
     out = np.empty_like(env)
-    prev = env[0]
-    # attack (rise) smoothing
-    for i in range(env.size):
-        prev += (env[i] - prev) / atk
-        out[i] = prev
-    # release (fall) smoothing
-    prev = out[-1]
-    for i in range(env.size - 1, -1, -1):
-        prev += (out[i] - prev) / rel
-        out[i] = prev
-    return out
+    if _HAS_NUMBA:
+        _smooth_ar(env, 1.0 / atk, 1.0 / rel, out)
+        return out
+    # Same one-pole recurrences as _smooth_ar, expressed as first-order IIR
+    # filters so scipy runs them in C instead of a Python loop.
+    a_atk = 1.0 / atk
+    a_rel = 1.0 / rel
+    # Coeficientes en el dtype de la señal: lfilter promociona al dtype común,
+    # y listas de floats la subirían a float64.
+    dt = env.dtype
+    out, _ = lfilter(np.array([a_atk], dtype=dt), np.array([1.0, -(1.0 - a_atk)], dtype=dt),
+                     env, zi=np.array([(1.0 - a_atk) * env[0]], dtype=dt))
+    rev = out[::-1]
+    rev, _ = lfilter(np.array([a_rel], dtype=dt), np.array([1.0, -(1.0 - a_rel)], dtype=dt),
+                     rev, zi=np.array([(1.0 - a_rel) * rev[0]], dtype=dt))
+    return np.ascontiguousarray(rev[::-1])
+
+@functools.lru_cache(maxsize=32)
+def _load_mono_cached(path: str, mtime_ns: int, sr: Optional[int]) -> np.ndarray:
+    """Mono del molde cacheado por (ruta, mtime, sr): corridas sucesivas con los
+    mismos moldes (cambiando BPM/attack/floor) se saltan decode y resample."""
+    y, _sr = load_audio(path, sr_target=sr)
+    y = np.ascontiguousarray(to_mono(y))
+    y.flags.writeable = False
+    return y
+
+@functools.lru_cache(maxsize=32)
+def _raw_env_cached(path: str, mtime_ns: int, sr: Optional[int],
+                    mode: str, frame: int, hop: int) -> np.ndarray:
+    """Envolvente cruda cacheada; el suavizado (depende de attack/release) no."""
+    y = _load_mono_cached(path, mtime_ns, sr)
+    if mode == "rms":
+        env = envelope_rms(y, frame=frame, hop=hop)
+    else:
+        env = envelope_hilbert(y)
+    env.flags.writeable = False
+    return env
+
+def loop_to_length_into(arr: np.ndarray, out: np.ndarray) -> None:
+    """Como loop_to_length pero escribe en un buffer dado (p.ej. una fila
+    del stack (M, N) preasignado), sin asignar salida propia."""
+    length = out.size
+    if arr.size >= length:
+        out[:] = arr[:length]
+        return
+    # Escribe exactamente `length` muestras: np.tile materializaba
+    # reps*arr.size y después recortaba la cola.
+    full = (length // arr.size) * arr.size
+    if full:
+        out[:full].reshape(-1, arr.size)[:] = arr  # asignación broadcast, sin temporal
+    out[full:] = arr[:length - full]
 
 def loop_to_length(arr: np.ndarray, length: int) -> np.ndarray:
     if arr.size >= length:
         return arr[:length]
-    reps = (length + arr.size - 1) // arr.size
-    out = np.tile(arr, reps)[:length]
+    out = np.empty(length, dtype=arr.dtype)
+    loop_to_length_into(arr, out)
     return out
 
-def combine_envelopes(envs: List[np.ndarray], mode: str = "max", weights: Optional[List[float]] = None) -> np.ndarray:
-    E = np.stack(envs, axis=0)  # (M, N)
+def combine_envelopes(envs, mode: str = "max", weights: Optional[List[float]] = None) -> np.ndarray:
+    # Acepta una lista de envolventes o el stack (M, N) ya contiguo
+    E = envs if isinstance(envs, np.ndarray) else np.stack(envs, axis=0)  # (M, N)
     mode = (mode or "max").lower()
     if mode == "max":
+        if _HAS_NUMBA:
+            out = np.empty(E.shape[1], dtype=E.dtype)
+            _combine_max(E, out)
+            return out
         return np.max(E, axis=0)
     if mode == "mean":
         return np.mean(E, axis=0)
     if mode == "geom_mean":
-        # avoid zeros
-        return np.exp(np.mean(np.log(np.clip(E, 1e-12, None)), axis=0))
+        M = E.shape[0]
+        Ec = np.clip(E, np.float32(1e-12), None)  # avoid zeros
+        if M <= 8:
+            # Pocos moldes (el caso típico): prod + una raíz por muestra en
+            # vez de log/exp transcendentales sobre todo el stack. El producto
+            # se acumula en float64 para que valores cerca del piso (1e-12)
+            # no subdesborden antes de la raíz.
+            g = np.power(np.prod(Ec, axis=0, dtype=np.float64), 1.0 / M)
+            return g.astype(E.dtype, copy=False)
+        np.log(Ec, out=Ec)  # in-place: reusa el buffer del clip
+        return np.exp(Ec.mean(axis=0))
     if mode == "product":
         return np.prod(np.clip(E, 1e-6, None), axis=0)
     if mode == "sum_limited":
+        if _HAS_NUMBA:
+            out = np.empty(E.shape[1], dtype=E.dtype)
+            _combine_sum_limited(np.ascontiguousarray(E), out)
+            return out
         s = np.sum(E, axis=0)
         # limit to 1.5x of max single env to avoid overboost
         limit = np.max(E, axis=0) * 1.5
         return np.minimum(s, limit)
     if mode == "weighted":
-        if not weights or len(weights) != E.shape[0]:
+        if weights is None or len(weights) != E.shape[0]:
             raise ValueError("weights length must match number of envelopes when mode='weighted'")
-        W = np.array(weights, dtype=np.float64)[:, None]
-        return np.sum(E * W, axis=0) / (np.sum(W) + 1e-12)
+        w = np.ascontiguousarray(weights, dtype=E.dtype)
+        if _HAS_NUMBA:
+            out = np.empty(E.shape[1], dtype=E.dtype)
+            _combine_weighted(E, w, 1.0 / (float(w.sum()) + 1e-12), out)
+            return out
+        # multiply-accumulate fusionado: sin el temporal (M, N) de E * w
+        w = w / (w.sum() + np.float32(1e-12))
+        return np.einsum('m,mn->n', w, E, optimize=True)
     # default
     return np.max(E, axis=0)
 
+@functools.lru_cache(maxsize=4)
+def _meter(sr: int):
+    # Construir pyln.Meter implica diseñar los filtros K-weighting; con el
+    # SR fijo por sesión basta cachear unas pocas instancias.
+    return pyln.Meter(sr)
+
 def match_lufs(target: np.ndarray, sr: int, ref_lufs: float) -> float:
     """Return linear gain to reach ref_lufs from target signal loudness."""
     if not _HAS_LOUD:
         return 1.0
-    meter = pyln.Meter(sr)
+    meter = _meter(sr)
     loud = meter.integrated_loudness(target.astype(np.float64))
     gain_db = ref_lufs - loud
     return db_to_lin(gain_db)
@@ -103,7 +311,10 @@ def apply_envelopes(dest_path: str, mold_paths: list[str], out_path: str, cfg: D
     """Main pipeline: load destination, build/loop/merge envelopes from molds, apply, write."""
     progress_cb(2); log_cb(f"Destino: {Path(dest_path).name}")
     y_dst, sr = load_audio(dest_path, sr_target=None)  # keep native SR
+    # La salida es mono: bajamos a mono ya mismo y soltamos el multicanal
+    # para no retener ambos buffers durante todo el pipeline.
     y_dst_mono = to_mono(y_dst)
+    del y_dst
     N = y_dst_mono.shape[-1]
     progress_cb(5)
 
@@ -117,63 +328,96 @@ def apply_envelopes(dest_path: str, mold_paths: list[str], out_path: str, cfg: D
     combine_mode = (cfg.get("combine_mode") or "max").lower()
     weights = cfg.get("weights", None)
     match_lufs_flag = bool(cfg.get("match_lufs", False))
+    # Build envelopes from molds, one task per mold. NumPy/SciPy sueltan el
+    # GIL en FFT/filtrado, así que los hilos escalan casi lineal en cores.
+    # Cada tarea escribe su fila del stack (M, N) preasignado: el combine
+    # recibe un buffer contiguo sin el copy final de np.stack.
+    env_stack = np.empty((len(mold_paths), N), dtype=np.float32)
 
-    # Build envelopes from molds
-    envs = []
-    total_m = max(1, len(mold_paths))
-    for i, p in enumerate(mold_paths, start=1):
-        log_cb(f"Cargando molde: {Path(p).name}")
-        y_m, sr_m = load_audio(p, sr_target=sr)  # resample to destination SR
-        y_mono = to_mono(y_m)
-
-        # raw envelope
-        if mode == "rms":
-            env = envelope_rms(y_mono, frame=frame, hop=hop)
+    def _build_env(p):
+        try:
+            mtime_ns = os.stat(p).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None:
+            # Cache por (ruta, mtime, sr[, modo]): en un hit se salta decode,
+            # resample y FFT.
+            env = _raw_env_cached(p, mtime_ns, sr, mode, frame, hop)
         else:
-            env = envelope_hilbert(y_mono)
+            y_m, _sr_m = load_audio(p, sr_target=sr)  # resample to destination SR
+            y_mono = to_mono(y_m)
+            if mode == "rms":
+                env = envelope_rms(y_mono, frame=frame, hop=hop)
+            else:
+                env = envelope_hilbert(y_mono)
 
-        # normalize envelope to [0..1]
-        peak = float(np.max(env) + 1e-12)
-        env = env / peak
+        # normalize envelope to [0..1]: multiplicar por el recíproco es más
+        # barato por muestra que dividir (la copia es necesaria: el env
+        # cacheado es de solo lectura)
+        inv = np.float32(1.0 / (float(np.max(env)) + 1e-12))
+        env = np.multiply(env, inv)
 
-        # smooth
+        # smooth + loop to destination length
         env = smooth_envelope(env, sr=sr, attack_ms=attack_ms, release_ms=release_ms)
+        return env
 
-        # loop to destination length
-        env = loop_to_length(env, N)
+    def _fill_row(i, p):
+        loop_to_length_into(np.asarray(_build_env(p), dtype=np.float32), env_stack[i])
 
-        envs.append(env)
-        progress_cb(5 + int(60 * i / total_m))
+    total_m = max(1, len(mold_paths))
+    if mold_paths:
+        workers = min(len(mold_paths), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futs = {ex.submit(_fill_row, i, p): i for i, p in enumerate(mold_paths)}
+            done = 0
+            for fut in as_completed(futs):
+                i = futs[fut]
+                fut.result()  # re-lanza la excepción del molde fallido
+                done += 1
+                log_cb(f"Molde listo: {Path(mold_paths[i]).name}")
+                progress_cb(5 + int(60 * done / total_m))
 
-    if not envs:
+    if env_stack.shape[0] == 0:
         raise RuntimeError("No se encontraron moldes válidos.")
 
     # combine
     log_cb(f"Combinando envelopes (mode={combine_mode})…")
-    E = combine_envelopes(envs, mode=combine_mode, weights=weights)
-
-    # floor in dB (avoid total mute)
-    floor_lin = db_to_lin(floor_db)  # negative value, e.g., -40 dB -> small positive lin
-    E = np.clip(E, floor_lin, None)
+    E = combine_envelopes(env_stack, mode=combine_mode, weights=weights)
 
-    # apply to destination (per channel)
-    y_out = np.empty_like(y_dst, dtype=np.float32)
-    for ci in range(y_dst.shape[0]):
-        y_out[ci] = (y_dst[ci] * E).astype(np.float32)
+    # floor in dB (avoid total mute) + multiply al downmix mono. Con numexpr
+    # el clip y el producto se fusionan en una sola pasada multihilo; clip y
+    # multiply separados recorren E y la salida dos veces.
+    floor_lin = np.float32(db_to_lin(floor_db))  # e.g., -40 dB -> small positive lin
+    y_mono = y_dst_mono.astype(np.float32, copy=False)
+    if _HAS_NE:
+        y_out = ne.evaluate("where(E < f, f, E) * y",
+                            local_dict={"E": E, "f": floor_lin, "y": y_mono})
+    else:
+        E = np.clip(E, floor_lin, None)
+        y_out = y_mono * E
 
     progress_cb(90)
 
     # optional loudness match: keep destination LUFS
     if match_lufs_flag and _HAS_LOUD:
-        meter = pyln.Meter(sr)
-        ref_lufs = meter.integrated_loudness(y_dst_mono.astype(np.float64))
-        cur_lufs = meter.integrated_loudness(to_mono(y_out).astype(np.float64))
+        meter = _meter(sr)
+        # Las dos medidas son independientes y liberan el GIL en el filtrado.
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            f_ref = ex.submit(meter.integrated_loudness, y_dst_mono.astype(np.float64))
+            f_cur = ex.submit(meter.integrated_loudness, y_out.astype(np.float64))
+            ref_lufs = f_ref.result()
+            cur_lufs = f_cur.result()
         gain_db = ref_lufs - cur_lufs
         g = db_to_lin(gain_db)
-        y_out = (y_out * g).astype(np.float32)
+        y_out *= np.float32(g)  # in-place: sin copia ni reconversión
         log_cb(f"LUFS match: {cur_lufs:.2f} → {ref_lufs:.2f} dB, gain {gain_db:.2f} dB")
 
-    # write
-    sf.write(out_path, to_mono(y_out), sr)  # write mono by default for simplicity
+    # write: FLOAT evita una reconversión del buffer float32, pero solo los
+    # formatos que lo soportan (WAV/AIFF); FLAC/OGG/MP3 usan su subtype default
+    fmt = os.path.splitext(out_path)[1].lstrip(".").upper() or "WAV"
+    if sf.check_format(fmt, "FLOAT"):
+        sf.write(out_path, y_out, sr, subtype="FLOAT")  # mono output
+    else:
+        sf.write(out_path, y_out, sr)  # mono output
     progress_cb(100)
     log_cb(f"Escrito: {out_path}")
\ No newline at end of file